@@ -1,6 +1,7 @@
 import pandas as pd
 import re
 from typing import Dict, List, Optional, Tuple
+from keyword_patterns import compile_keyword_pattern
 
 # --- BILL DETECTION CONFIGURATION ---
 # Keywords that indicate bill-related news
@@ -17,6 +18,13 @@ BRANCH_KEYWORDS = {
     'both': ['congress passed', 'congress approved', 'both chambers', 'house and senate']
 }
 
+# Key phrases that explain the bill's purpose
+EXPLANATION_KEYWORDS = [
+    'funds', 'funding', 'allocates', 'provides', 'establishes',
+    'regulates', 'regulations', 'requires', 'mandates', 'authorizes',
+    'creates', 'expands', 'reduces', 'increases', 'decreases'
+]
+
 # --- SECTOR MAPPING ---
 SECTOR_KEYWORDS = {
     'AI/Technology': [
@@ -73,26 +81,60 @@ COMPANIES_BY_SECTOR = {
     ],
     'Defense': [
         'LMT', 'RTX', 'BA', 'GD', 'NOC', 'LHX', 'TDG', 'AJRD',
-        'KTOS', 'AIR', 'TDG', 'HII', 'LDOS'
+        'KTOS', 'AIR', 'HII', 'LDOS'
     ],
     'Education': [
         'APEI', 'LOPE', 'STRA', 'ZVO', 'LAUR', 'EDU', 'TAL', 'GHC'
     ]
 }
 
+# Deduplicated, immutable company tuples per sector, built once at import
+SECTOR_COMPANIES = {
+    sector: tuple(dict.fromkeys(companies)) for sector, companies in COMPANIES_BY_SECTOR.items()
+}
+
+# --- KEYWORD PATTERNS ---
+BILL_KEYWORD_PATTERN = compile_keyword_pattern(BILL_KEYWORDS)
+BRANCH_KEYWORD_PATTERNS = {
+    branch: compile_keyword_pattern(keywords) for branch, keywords in BRANCH_KEYWORDS.items()
+}
+EXPLANATION_KEYWORD_PATTERN = compile_keyword_pattern(EXPLANATION_KEYWORDS)
+SECTOR_KEYWORD_PATTERNS = {
+    sector: compile_keyword_pattern(keywords) for sector, keywords in SECTOR_KEYWORDS.items()
+}
+
+# --- BILL EXTRACTION PATTERNS ---
+# Compiled once at import so the per-article scan doesn't re-parse them
+# Bill number patterns (ex: "H.R. 1234" or "S. 5678")
+BILL_NUMBER_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'([A-Z]\.R\.\s+\d+)',  # H.R. 1234
+    r'([A-Z]\.\s+\d+)',     # S. 5678
+    r'([A-Z][A-Z]\d+)',     # HR1234, S5678
+    r'([A-Z][a-z]+\.?\s+\d+)'  # House 1234, Senate 5678
+))
+
+# Bill name patterns (quoted text or capitalized phrases)
+BILL_NAME_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'"([^"]+)"',  # Quoted text
+    r'([A-Z][A-Za-z\s]+Act)',  # Something Act
+    r'([A-Z][A-Za-z\s]+Bill)',  # Something Bill
+    r'([A-Z][A-Za-z\s]+Law)'   # Something Law
+))
+
 # --- BILL EXTRACTION ---
-def extract_bill_info(article_text: str) -> Optional[Dict]:
+def extract_bill_info(article_text: str, text_lower: Optional[str] = None) -> Optional[Dict]:
     """
     Extract bill information from article text.
     Returns dict with bill details or None if no bill found.
+    Pass text_lower if the caller already has the lowercased text.
     """
     if not article_text:
         return None
-    
-    text_lower = article_text.lower()
+    if text_lower is None:
+        text_lower = article_text.lower()
     
     # Check if article contains bill-related keywords
-    if not any(keyword in text_lower for keyword in BILL_KEYWORDS):
+    if not BILL_KEYWORD_PATTERN.search(text_lower):
         return None
     
     bill_info = {
@@ -103,97 +145,79 @@ def extract_bill_info(article_text: str) -> Optional[Dict]:
         'sectors_affected': []
     }
     
-    # Extract bill name (look for patterns, ex: "H.R. 1234" or "S. 5678")
-    bill_patterns = [
-        r'([A-Z]\.R\.\s+\d+)',  # H.R. 1234
-        r'([A-Z]\.\s+\d+)',     # S. 5678
-        r'([A-Z][A-Z]\d+)',     # HR1234, S5678
-        r'([A-Z][a-z]+\.?\s+\d+)'  # House 1234, Senate 5678
-    ]
-    
-    for pattern in bill_patterns:
-        matches = re.findall(pattern, article_text, re.IGNORECASE)
-        if matches:
-            bill_info['bill_number'] = matches[0]
+    # Extract bill number (only the first match is used)
+    for pattern in BILL_NUMBER_PATTERNS:
+        match = pattern.search(article_text)
+        if match:
+            bill_info['bill_number'] = match.group(1)
             break
     
     # Determine which branch passed it
-    for branch, keywords in BRANCH_KEYWORDS.items():
-        if any(keyword in text_lower for keyword in keywords):
+    for branch, pattern in BRANCH_KEYWORD_PATTERNS.items():
+        if pattern.search(text_lower):
             bill_info['branch_passed'] = branch
             break
     
     # Extract bill name (look for quoted text or capitalized phrases)
-    name_patterns = [
-        r'"([^"]+)"',  # Quoted text
-        r'([A-Z][A-Za-z\s]+Act)',  # Something Act
-        r'([A-Z][A-Za-z\s]+Bill)',  # Something Bill
-        r'([A-Z][A-Za-z\s]+Law)'   # Something Law
-    ]
-    
-    for pattern in name_patterns:
-        matches = re.findall(pattern, article_text)
-        if matches:
-            bill_info['bill_name'] = matches[0]
+    for pattern in BILL_NAME_PATTERNS:
+        match = pattern.search(article_text)
+        if match:
+            bill_info['bill_name'] = match.group(1)
             break
     
     # Generate explanation if we have bill info
     if bill_info['bill_number'] or bill_info['bill_name']:
-        bill_info['explanation'] = generate_bill_explanation(article_text)
-        bill_info['sectors_affected'] = identify_affected_sectors(article_text)
+        bill_info['explanation'] = generate_bill_explanation(article_text, text_lower)
+        bill_info['sectors_affected'] = identify_affected_sectors(article_text, text_lower)
     
     return bill_info if (bill_info['bill_number'] or bill_info['bill_name']) else None
 
-def generate_bill_explanation(article_text: str) -> str:
+def generate_bill_explanation(article_text: str, text_lower: Optional[str] = None) -> str:
     """
     Generate a brief, neutral explanation of what the bill does.
     """
-    # Extract key phrases that explain the bill's purpose
-    explanation_keywords = [
-        'funds', 'funding', 'allocates', 'provides', 'establishes',
-        'regulates', 'regulations', 'requires', 'mandates', 'authorizes',
-        'creates', 'expands', 'reduces', 'increases', 'decreases'
-    ]
-    
-    sentences = article_text.split('.')
-    relevant_sentences = []
+    if text_lower is None:
+        text_lower = article_text.lower()
     
-    for sentence in sentences:
-        if any(keyword in sentence.lower() for keyword in explanation_keywords):
-            relevant_sentences.append(sentence.strip())
+    # Keywords never contain '.', so the first keyword match lies inside the first
+    # relevant sentence and the article doesn't need to be split up front
+    match = EXPLANATION_KEYWORD_PATTERN.search(text_lower)
+    if not match:
+        return "Bill details and funding information available from official sources."
     
-    if relevant_sentences:
-        return relevant_sentences[0][:200] + "..."
+    if len(text_lower) == len(article_text):
+        # Same length means positions line up, so slice the sentence around the match
+        start = text_lower.rfind('.', 0, match.start()) + 1
+        end = text_lower.find('.', match.end())
+        sentence = article_text[start:end] if end != -1 else article_text[start:]
     else:
-        return "Bill details and funding information available from official sources."
+        # Lowercasing expanded some characters; find the sentence by counting '.' instead
+        sentence = article_text.split('.')[text_lower.count('.', 0, match.start())]
+    
+    return sentence.strip()[:200] + "..."
 
-def identify_affected_sectors(article_text: str) -> List[str]:
+def identify_affected_sectors(article_text: str, text_lower: Optional[str] = None) -> List[str]:
     """
     Identify which sectors are affected by the bill.
     """
-    text_lower = article_text.lower()
-    affected_sectors = []
-    
-    for sector, keywords in SECTOR_KEYWORDS.items():
-        if any(keyword in text_lower for keyword in keywords):
-            affected_sectors.append(sector)
+    if text_lower is None:
+        text_lower = article_text.lower()
     
-    return affected_sectors
+    return [sector for sector, pattern in SECTOR_KEYWORD_PATTERNS.items() if pattern.search(text_lower)]
 
 # --- COMPANY IDENTIFICATION ---
 def get_affected_companies(sectors: List[str], max_companies: int = 10) -> List[str]:
     """
     Get list of companies that might be affected by the bill.
     """
-    companies = []
+    # Ordered dedup: keeps the first occurrence of each company, so the result is deterministic
+    companies = {}
     
     for sector in sectors:
-        if sector in COMPANIES_BY_SECTOR:
-            companies.extend(COMPANIES_BY_SECTOR[sector])
+        companies.update(dict.fromkeys(SECTOR_COMPANIES.get(sector, ())))
     
-    # Remove duplicates and limit to max_companies
-    unique_companies = list(set(companies))
-    return unique_companies[:max_companies]
+    # Limit to max_companies
+    return list(companies)[:max_companies]
 
 # --- MAIN BILL ANALYSIS ---
 def analyze_bill_impact(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
@@ -206,8 +230,8 @@ def analyze_bill_impact(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
     if df.empty:
         return df, []
     
-    # Filter for Government/Policy articles
-    gov_articles = df[df['category'] == 'Government/Policy'].copy()
+    # Filter for Government/Policy articles (read-only, so no copy is needed)
+    gov_articles = df.loc[df['category'] == 'Government/Policy']
     
     if gov_articles.empty:
         print("📝 No Government/Policy articles found for bill analysis.")
@@ -215,9 +239,17 @@ def analyze_bill_impact(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
     
     bill_impacts = []
     
-    for idx, row in gov_articles.iterrows():
-        article_text = str(row.get('headline', '')) + ' ' + str(row.get('content', ''))
-        bill_info = extract_bill_info(article_text)
+    # Build article texts column-wide and only run the extractor on articles
+    # that mention a bill keyword. Each text is lowercased exactly once here.
+    article_texts = (gov_articles['headline'].fillna('').astype(str) + ' ' +
+                     gov_articles['content'].fillna('').astype(str))
+    lower_texts = article_texts.str.lower()
+    bill_mask = lower_texts.str.contains(BILL_KEYWORD_PATTERN, na=False)
+    
+    bill_rows = zip(gov_articles.loc[bill_mask].itertuples(), article_texts[bill_mask], lower_texts[bill_mask])
+    for row, article_text, text_lower in bill_rows:
+        idx = row.Index
+        bill_info = extract_bill_info(article_text, text_lower)
         
         if bill_info:
             # Get affected companies
@@ -225,7 +257,7 @@ def analyze_bill_impact(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
             
             bill_impact = {
                 'article_index': idx,
-                'headline': row.get('headline'),
+                'headline': row.headline,
                 'bill_name': bill_info['bill_name'],
                 'bill_number': bill_info['bill_number'],
                 'branch_passed': bill_info['branch_passed'],
@@ -241,13 +273,12 @@ def analyze_bill_impact(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
             print(f"   Companies: {', '.join(affected_companies[:5])}...")
             print()
     
-    # Add bill impact column to DataFrame
-    df = df.copy()
-    df['bill_impact'] = None
+    # Add bill impact column to a new DataFrame (assign copies once and leaves the caller's frame intact)
+    df = df.assign(bill_impact=None)
     
-    for impact in bill_impacts:
-        idx = impact['article_index']
-        df.iloc[idx, df.columns.get_loc('bill_impact')] = '📋 Bill Impact'
+    # article_index holds index labels, so mark all impacted rows in one .loc write
+    impacted_idx = [impact['article_index'] for impact in bill_impacts]
+    df.loc[impacted_idx, 'bill_impact'] = '📋 Bill Impact'
     
     print(f"✅ Bill analysis complete: {len(bill_impacts)} bills found")
     return df, bill_impacts
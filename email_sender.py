@@ -1,30 +1,49 @@
 import os
 import base64
 import json
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+from email import policy
+from email.message import EmailMessage
 from datetime import datetime
-from typing import Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from dotenv import load_dotenv
+from typing import Optional, Tuple
 
-# Load environment variables
-load_dotenv()
+# The Google API client and dotenv are imported lazily: they are slow to import and
+# only needed when actually sending, not when building or previewing a message.
+_dotenv_loaded = False
+
+def load_environment() -> None:
+    """Load environment variables from .env once, on first use."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
 
 # Gmail API configuration
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 CREDENTIALS_FILE = 'credentials.json'  # Changed from credentials.b64
 TOKEN_FILE = 'token.json'  # Changed from token.b64
 
+# Authenticated Gmail service, reused across sends while its credentials stay valid
+_gmail_service = None
+_gmail_credentials = None
+_gmail_service_lock = threading.Lock()
+
 def authenticate_gmail() -> Optional[object]:
     """
     Authenticate with Gmail API using OAuth2.
     Returns Gmail service object or None if authentication fails.
     """
+    return _authenticate_gmail()[0]
+
+def _authenticate_gmail() -> Tuple[Optional[object], Optional[object]]:
+    """Authenticate with Gmail API, returning the service and the credentials it was built with (or None, None)."""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+    
+    load_environment()
     creds = None
     
     try:
@@ -71,10 +90,10 @@ def authenticate_gmail() -> Optional[object]:
                         print("✅ Authentication completed")
                     except Exception as creds_error:
                         print(f"❌ Error loading credentials: {creds_error}")
-                        return None
+                        return None, None
                 else:
                     print("❌ Credentials file not found. Please ensure credentials.json exists.")
-                    return None
+                    return None, None
             
             # Save the credentials for the next run
             if creds:
@@ -82,15 +101,15 @@ def authenticate_gmail() -> Optional[object]:
                 with open(TOKEN_FILE, 'w') as token_file:
                     token_file.write(creds.to_json())
         
-        # Build the Gmail service
+        # Build the Gmail service (bundled discovery document, no HTTP fetch)
         if creds:
             print("🔧 Building Gmail service...")
-            service = build('gmail', 'v1', credentials=creds)
+            service = build('gmail', 'v1', credentials=creds, static_discovery=True)
             print("✅ Gmail authentication successful!")
-            return service
+            return service, creds
         else:
             print("❌ No valid credentials available")
-            return None
+            return None, None
         
     except Exception as e:
         print(f"❌ Gmail authentication failed: {e}")
@@ -98,7 +117,27 @@ def authenticate_gmail() -> Optional[object]:
         print("   1. Gmail API is not enabled in your Google Cloud project")
         print("   2. Your credentials don't have the correct scopes")
         print("   3. The project doesn't have Gmail API access")
-        return None
+        return None, None
+
+def get_gmail_service() -> Optional[object]:
+    """
+    Return the cached Gmail service, authenticating only when there is none yet
+    or its credentials are no longer valid (ex: the access token expired).
+    """
+    global _gmail_service, _gmail_credentials
+    
+    with _gmail_service_lock:
+        if _gmail_service is None or not (_gmail_credentials and _gmail_credentials.valid):
+            _gmail_service, _gmail_credentials = _authenticate_gmail()
+        return _gmail_service
+
+def reset_gmail_service() -> None:
+    """Drop the cached Gmail service so the next send re-authenticates."""
+    global _gmail_service, _gmail_credentials
+    
+    with _gmail_service_lock:
+        _gmail_service = None
+        _gmail_credentials = None
 
 def create_email_message(html_content: str, recipient_email: str, sender_email: str = None) -> dict:
     """
@@ -107,22 +146,24 @@ def create_email_message(html_content: str, recipient_email: str, sender_email:
     """
     # Get sender email from environment or use default
     if not sender_email:
+        load_environment()
         sender_email = os.getenv('EMAIL_SENDER')
         if not sender_email:
             print("⚠️  EMAIL_SENDER not set in environment. Using authenticated user's email.")
     
     # Create message
-    message = MIMEMultipart('alternative')
-    message['to'] = recipient_email
-    message['from'] = sender_email
-    message['subject'] = f"📰 Daily News Digest — {datetime.now().strftime('%B %d, %Y')}"
+    message = EmailMessage(policy=policy.SMTP)
+    message['To'] = recipient_email
+    if sender_email:
+        message['From'] = sender_email
+    message['Subject'] = f"📰 Daily News Digest — {datetime.now().strftime('%B %d, %Y')}"
     
-    # Add HTML content
-    html_part = MIMEText(html_content, 'html')
-    message.attach(html_part)
+    # Add a plain text fallback and the HTML content as alternatives
+    message.set_content("Your Daily News Digest is best viewed in an email client that supports HTML.")
+    message.add_alternative(html_content, subtype='html')
     
     # Encode the message for Gmail API
-    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+    raw_message = base64.urlsafe_b64encode(bytes(message)).decode('ascii')
     
     return {
         'raw': raw_message
@@ -130,11 +171,14 @@ def create_email_message(html_content: str, recipient_email: str, sender_email:
 
 def send_daily_digest(html_content: str, recipient_email: str) -> bool:
     """Send the daily news digest email"""
+    from googleapiclient.errors import HttpError
+    
+    load_environment()
     try:
         print("📧 Sending daily news digest email...")
         
-        # Authenticate with Gmail
-        service = authenticate_gmail()
+        # Authenticate with Gmail (reuses the cached service when still valid)
+        service = get_gmail_service()
         if not service:
             print("❌ Gmail authentication failed - cannot send email")
             return False
@@ -159,6 +203,7 @@ def send_daily_digest(html_content: str, recipient_email: str) -> bool:
         print(f"❌ Gmail API error: {e}")
         if e.resp.status == 401:
             print("🔑 Authentication failed - check your Gmail API credentials")
+            reset_gmail_service()
         elif e.resp.status == 403:
             print("🚫 Permission denied - check Gmail API scopes")
         elif e.resp.status == 429:
@@ -173,6 +218,7 @@ def test_email_sending(recipient_email: str = None) -> bool:
     Test email sending functionality with a simple HTML email.
     """
     if not recipient_email:
+        load_environment()
         recipient_email = os.getenv('EMAIL_RECIPIENTS')
         if not recipient_email:
             print("❌ EMAIL_RECIPIENTS not set in environment variables")
@@ -200,6 +246,7 @@ if __name__ == "__main__":
     # Test email sending
     print("🧪 Testing email sending functionality...")
     
+    load_environment()
     recipient = os.getenv('EMAIL_RECIPIENTS')
     if not recipient:
         print("❌ Please set EMAIL_RECIPIENTS in your environment variables")
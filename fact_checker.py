@@ -1,6 +1,8 @@
 import pandas as pd
 import re
-from typing import List, Dict, Tuple
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import List, Dict, Optional, Tuple
 from difflib import SequenceMatcher
 
 # --- FACT CHECKING CONFIGURATION ---
@@ -18,6 +20,19 @@ UNVERIFIED_KEYWORDS = [
     'may', 'might', 'could', 'possibly', 'potentially'
 ]
 
+# Fact extraction patterns, compiled once at import
+# Dates (basic pattern)
+DATE_PATTERN = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}\b')
+# Numbers (percentages, amounts, etc.)
+NUMBER_PATTERN = re.compile(r'\b\d+(?:\.\d+)?%\b|\$\d+(?:,\d{3})*(?:\.\d{2})?\b|\b\d+(?:\.\d+)?\s*(?:million|billion|thousand)\b')
+# Names and organizations are only extracted by extract_facts; consistency checks compare dates and numbers
+# Names (basic pattern - could use NLP in the future)
+NAME_PATTERN = re.compile(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b')
+# Organizations (basic pattern)
+ORG_PATTERN = re.compile(r'\b[A-Z][A-Z\s&]+(?:Corp|Inc|LLC|Ltd|Company|Organization|Foundation)\b')
+# Every organization match ends in one of these, so texts without any skip the scan
+ORG_SUFFIXES = ('Corp', 'Inc', 'LLC', 'Ltd', 'Company', 'Organization', 'Foundation')
+
 # --- SIMILARITY DETECTION ---
 def find_similar_articles(df: pd.DataFrame, similarity_threshold: float = 0.6) -> List[List[int]]:
     """
@@ -27,26 +42,48 @@ def find_similar_articles(df: pd.DataFrame, similarity_threshold: float = 0.6) -
     similar_groups = []
     processed = set()
     
-    for i, row1 in df.iterrows():
+    # Lowercase every headline once instead of once per compared pair
+    indices = df.index.tolist()
+    headlines = [str(headline).lower() for headline in df['headline']] if 'headline' in df else [''] * len(df)
+    
+    # Index headlines by length. ratio() is bounded by 2 * min(len) / (len1 + len2), so
+    # only headlines with lengths in [len * t / (2 - t), len * (2 - t) / t] can match
+    by_length = sorted(range(len(headlines)), key=lambda k: len(headlines[k]))
+    lengths = [len(headlines[k]) for k in by_length]
+    t = similarity_threshold
+    matchers = {}
+    
+    for i in range(len(indices)):
         if i in processed:
             continue
             
-        similar_group = [i]
+        similar_group = [indices[i]]
         processed.add(i)
         
-        # Compare with other articles
-        for j, row2 in df.iterrows():
+        # Compare with later candidate articles (every earlier one is already processed)
+        length = len(headlines[i])
+        low = bisect_left(lengths, length * t / (2 - t))
+        high = bisect_right(lengths, length * (2 - t) / t) if t > 0 else len(lengths)
+        candidates = sorted(j for j in by_length[low:high] if j > i)
+        
+        for j in candidates:
             if j in processed:
                 continue
                 
-            # Calculate similarity between headlines
-            headline1 = str(row1.get('headline', '')).lower()
-            headline2 = str(row2.get('headline', '')).lower()
-            
-            similarity = SequenceMatcher(None, headline1, headline2).ratio()
+            # Calculate similarity between headlines. real_quick_ratio() and quick_ratio()
+            # are cheap upper bounds on ratio(), so most dissimilar pairs stop early.
+            # Each later headline keeps its own matcher so its b-side index is built once.
+            matcher = matchers.get(j)
+            if matcher is None:
+                matcher = matchers[j] = SequenceMatcher(None, '', headlines[j])
+            matcher.set_seq1(headlines[i])
+            if (matcher.real_quick_ratio() <= similarity_threshold or
+                    matcher.quick_ratio() <= similarity_threshold):
+                continue
+            similarity = matcher.ratio()
             
             if similarity > similarity_threshold:
-                similar_group.append(j)
+                similar_group.append(indices[j])
                 processed.add(j)
         
         if len(similar_group) > 1:
@@ -59,6 +96,8 @@ def extract_facts(text: str) -> Dict[str, List[str]]:
     """
     Extract factual claims from article text.
     Returns dict with fact types and values.
+    Kept as public API for callers that want every fact type; the pipeline itself
+    uses extract_consistency_facts, which shares DATE_PATTERN and NUMBER_PATTERN.
     """
     facts = {
         'dates': [],
@@ -71,59 +110,65 @@ def extract_facts(text: str) -> Dict[str, List[str]]:
     if not text:
         return facts
     
-    text_lower = text.lower()
-    
-    # Extract dates (basic pattern)
-    date_pattern = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}\b'
-    facts['dates'] = re.findall(date_pattern, text)
-    
-    # Extract numbers (percentages, amounts, etc.)
-    number_pattern = r'\b\d+(?:\.\d+)?%\b|\$\d+(?:,\d{3})*(?:\.\d{2})?\b|\b\d+(?:\.\d+)?\s*(?:million|billion|thousand)\b'
-    facts['numbers'] = re.findall(number_pattern, text)
-    
-    # Extract names (basic pattern - could use NLP in the future)
-    name_pattern = r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b'
-    facts['names'] = re.findall(name_pattern, text)
-    
-    # Extract organizations (basic pattern)
-    org_pattern = r'\b[A-Z][A-Z\s&]+(?:Corp|Inc|LLC|Ltd|Company|Organization|Foundation)\b'
-    facts['organizations'] = re.findall(org_pattern, text)
+    facts['dates'] = DATE_PATTERN.findall(text)
+    facts['numbers'] = NUMBER_PATTERN.findall(text)
+    facts['names'] = NAME_PATTERN.findall(text)
+    if any(suffix in text for suffix in ORG_SUFFIXES):
+        facts['organizations'] = ORG_PATTERN.findall(text)
     
     return facts
 
+def extract_consistency_facts(texts: pd.Series) -> pd.DataFrame:
+    """
+    Extract the dates and numbers compared by check_fact_consistency for many texts at once.
+    Returns a DataFrame with 'dates' and 'numbers' list columns, indexed like texts.
+    """
+    return pd.DataFrame({
+        'dates': texts.str.findall(DATE_PATTERN),
+        'numbers': texts.str.findall(NUMBER_PATTERN),
+    }, index=texts.index)
+
 # --- CONSISTENCY CHECKING ---
 def check_article_consistency(df: pd.DataFrame) -> pd.DataFrame:
     """
     Check articles for factual consistency and add fact-check status.
+    Updates df in place and returns it.
     """
     if df.empty:
         return df
     
-    df = df.copy()
     df['fact_check_status'] = '🔍 Fact-checked'  # Default status
     
     # Find similar articles
     similar_groups = find_similar_articles(df)
+    if not similar_groups:
+        return df
+    
+    # Join headline and content and extract facts for every grouped article in one pass
+    grouped_idx = [idx for group in similar_groups for idx in group]
+    grouped = df.loc[grouped_idx]
+    article_texts = grouped['headline'].fillna('').astype(str) + ' ' + grouped['content'].fillna('').astype(str)
+    grouped_facts = extract_consistency_facts(article_texts)
+    unverified_idx = []
     
     for group in similar_groups:
         if len(group) < 2:
             continue
             
-        # Extract facts from each article in the group
-        group_facts = []
-        for idx in group:
-            article_text = str(df.iloc[idx].get('headline', '')) + ' ' + str(df.iloc[idx].get('content', ''))
-            facts = extract_facts(article_text)
-            group_facts.append(facts)
+        # Facts for each article in the group
+        group_facts = grouped_facts.loc[group].to_dict('records')
         
         # Check for inconsistencies
         inconsistencies = check_fact_consistency(group_facts)
         
-        # Flag articles with inconsistencies
+        # Flag articles with inconsistencies (reported once per group)
         if inconsistencies:
-            for idx in group:
-                df.iloc[idx, df.columns.get_loc('fact_check_status')] = '⚠️ Unverified'
-                print(f"⚠️  Inconsistency found in article {idx}: {inconsistencies}")
+            unverified_idx.extend(group)
+            print(f"⚠️  Inconsistency found in articles {', '.join(map(str, group))}: {inconsistencies}")
+    
+    # Write every flagged status in one assignment
+    if unverified_idx:
+        df.loc[unverified_idx, 'fact_check_status'] = '⚠️ Unverified'
     
     return df
 
@@ -137,47 +182,62 @@ def check_fact_consistency(facts_list: List[Dict]) -> List[str]:
     if len(facts_list) < 2:
         return inconsistencies
     
-    # Compare dates
-    all_dates = []
-    for facts in facts_list:
-        all_dates.extend(facts['dates'])
+    # Compare dates (more than one distinct date implies more than one date)
+    unique_dates = set(chain.from_iterable(facts['dates'] for facts in facts_list))
     
-    if len(set(all_dates)) > 1 and len(all_dates) > 1:
-        inconsistencies.append(f"Conflicting dates: {set(all_dates)}")
+    if len(unique_dates) > 1:
+        inconsistencies.append(f"Conflicting dates: {unique_dates}")
     
     # Compare numbers (basic check)
-    all_numbers = []
-    for facts in facts_list:
-        all_numbers.extend(facts['numbers'])
+    unique_numbers = set(chain.from_iterable(facts['numbers'] for facts in facts_list))
     
-    if len(set(all_numbers)) > 1 and len(all_numbers) > 1:
+    if len(unique_numbers) > 1:
         # Better number comparison could be added here
         pass
     
     return inconsistencies
 
 # --- UNVERIFIED CLAIM DETECTION ---
-def flag_unverified_claims(df: pd.DataFrame) -> pd.DataFrame:
+def count_keywords(texts: pd.Series, keywords: List[str]) -> pd.Series:
+    """
+    Count how many of the keywords appear in each text (each keyword counts once).
+    Runs one vectorized substring pass per keyword instead of a Python loop per row.
+    """
+    counts = pd.Series(0, index=texts.index)
+    for keyword in keywords:
+        counts += texts.str.contains(keyword, regex=False)
+    return counts
+
+def lowercase_article_texts(df: pd.DataFrame) -> pd.Series:
+    """
+    Lowercase every article's headline and content together, once per DataFrame.
+    """
+    return (df['headline'].fillna('').astype(str) + ' ' +
+            df['content'].fillna('').astype(str)).str.lower()
+
+def flag_unverified_claims(df: pd.DataFrame, text_lower: Optional[pd.Series] = None) -> pd.DataFrame:
     """
     Flag articles that contain unverified claims.
+    Updates df in place and returns it.
+    Pass text_lower to reuse lowercased article text computed by the caller.
     """
     if df.empty:
         return df
     
-    df = df.copy()
+    if text_lower is None:
+        text_lower = lowercase_article_texts(df)
     
-    for idx, row in df.iterrows():
-        text = str(row.get('headline', '')) + ' ' + str(row.get('content', ''))
-        text_lower = text.lower()
-        
-        # Check for unverified claim indicators
-        unverified_count = sum(1 for keyword in UNVERIFIED_KEYWORDS if keyword in text_lower)
-        fact_count = sum(1 for keyword in FACT_KEYWORDS if keyword in text_lower)
-        
-        # If more unverified indicators than fact indicators, flag it
-        if unverified_count > fact_count and unverified_count > 0:
-            df.iloc[idx, df.columns.get_loc('fact_check_status')] = '⚠️ Unverified'
-            print(f"⚠️  Unverified claims detected in article {idx}")
+    # Check for unverified claim indicators
+    unverified_count = count_keywords(text_lower, UNVERIFIED_KEYWORDS)
+    fact_count = count_keywords(text_lower, FACT_KEYWORDS)
+    
+    # If more unverified indicators than fact indicators, flag it
+    unverified_mask = (unverified_count > fact_count) & (unverified_count > 0)
+    flagged_idx = df.index[unverified_mask]
+    if len(flagged_idx):
+        print(f"⚠️  Unverified claims detected in articles {', '.join(map(str, flagged_idx))}")
+    
+    df.loc[unverified_mask, 'fact_check_status'] = '⚠️ Unverified'
     
     return df
 
@@ -192,15 +252,22 @@ def fact_check_articles(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     
+    # Copy once here; the checks below update this copy in place
+    df = df.copy()
+    
+    # Lowercase article text once for every keyword scan below
+    text_lower = lowercase_article_texts(df)
+    
     # Check consistency across similar articles
     df = check_article_consistency(df)
     
     # Flag unverified claims
-    df = flag_unverified_claims(df)
+    df = flag_unverified_claims(df, text_lower)
     
     # Step 3: Count results
-    fact_checked = len(df[df['fact_check_status'] == '🔍 Fact-checked'])
-    unverified = len(df[df['fact_check_status'] == '⚠️ Unverified'])
+    status_counts = df['fact_check_status'].value_counts()
+    fact_checked = status_counts.get('🔍 Fact-checked', 0)
+    unverified = status_counts.get('⚠️ Unverified', 0)
     
     print(f"✅ Fact checking complete: {fact_checked} verified, {unverified} unverified")
     
@@ -219,7 +286,7 @@ if __name__ == "__main__":
     
     # Show results
     print("\n📊 Fact Check Results:")
-    for idx, row in df.iterrows():
-        status = row.get('fact_check_status', '❓ Unknown')
-        headline = row.get('headline', '')[:60]
+    for row in df.itertuples():
+        status = row.fact_check_status
+        headline = row.headline[:60]
         print(f"  {status} {headline}...") 
\ No newline at end of file
@@ -0,0 +1,27 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP session, so every request to a host reuses its pooled keep-alive connection.
+# Only failed connections (any method) and GET gateway errors (502/503/504) are retried briefly.
+# urllib3 does not retry POST on these statuses, so Gemini POSTs return them as-is.
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), raise_on_status=False)
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    """Return the shared HTTP session, creating it on first use."""
+    global _http_session
+
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE,
+                                  max_retries=HTTP_RETRIES)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({'User-Agent': 'newsie/1.0'})
+            _http_session = session
+        return _http_session
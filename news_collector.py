@@ -1,20 +1,29 @@
+import heapq
 import os
+import re
 import requests
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
+from http_session import get_http_session
+from keyword_patterns import compile_keyword_pattern
 
 # Load environment variables from .env file
 load_dotenv()
 
 # API keys should be set as environment variables for security
 NEWSAPI_KEY = os.getenv('NEWSAPI_KEY')
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1/models/gemini-1.5-flash:generateContent'
 
 # --- TRUSTED SOURCES AND CATEGORIES ---
+# Trusted source names (lowercase); articles from matching sources get a priority boost
 TRUSTED_KEYWORDS = [
-    'reuters', 'bloomberg', 'bbc', 'wall street journal', 'npr', 'financial times', 
-    'cnbc', 'politico', 'associated press', 'ap news'
+    'reuters', 'associated press', 'ap', 'bloomberg', 'bbc', 'wall street journal', 
+    'wsj', 'financial times', 'ft', 'the guardian', 'pbs newshour', 'politico',
+    'al jazeera', 'the hill', 'axios', 'npr', 'cnbc'
 ]
 
 # Enhanced keyword categories (content-based only)
@@ -100,13 +109,39 @@ CATEGORIES = {
     ],
 }
 
+# One compiled alternation per category, so each category is checked with a single
+# scan of the article text instead of one substring search per keyword
+CATEGORY_PATTERNS = {
+    category: compile_keyword_pattern([keyword.lower() for keyword in keywords])
+    for category, keywords in CATEGORIES.items()
+}
+
+# Content patterns checked when no category keyword matches. Only terms that contain
+# no CATEGORIES keyword belong here, since any text containing one already returned above
+FALLBACK_CONTENT_KEYWORDS = [
+    # World patterns (international events)
+    ('World', ['prince', 'defector']),
+]
+
+FALLBACK_CONTENT_PATTERNS = [
+    (category, compile_keyword_pattern(patterns))
+    for category, patterns in FALLBACK_CONTENT_KEYWORDS
+]
+
 # --- FETCH NEWS FROM NEWSAPI ---
+# Trusted outlets to fetch from; NewsAPI filters by domain server-side instead of
+# full-text searching every article for the outlet names
+NEWSAPI_DOMAINS = [
+    'reuters.com', 'bloomberg.com', 'wsj.com', 'bbc.com', 'bbc.co.uk', 'npr.org',
+    'ft.com', 'cnbc.com', 'politico.com', 'apnews.com'
+]
+
 def fetch_newsapi_articles() -> List[Dict]:
     """Fetch articles from NewsAPI"""
     url = 'https://newsapi.org/v2/everything'
     from_date = (datetime.utcnow() - timedelta(days=2)).strftime('%Y-%m-%dT%H:%M:%SZ')
     params = {
-        'q': 'reuters OR bloomberg OR "wall street journal" OR bbc OR npr OR "financial times" OR cnbc OR politico OR "associated press"',
+        'domains': ','.join(NEWSAPI_DOMAINS),
         'from': from_date,
         'language': 'en',
         'sortBy': 'publishedAt',
@@ -115,7 +150,7 @@ def fetch_newsapi_articles() -> List[Dict]:
     }
     
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = get_http_session().get(url, params=params, timeout=30)
         print(f"📅 Date range: {from_date} to now")
         print(f"📡 Response status: {response.status_code}")
         
@@ -139,6 +174,22 @@ def fetch_newsapi_articles() -> List[Dict]:
         print(f"❌ Unexpected error fetching from NewsAPI: {e}")
         return []
 
+def lowercase_article_fields(article: Dict) -> Tuple[str, str]:
+    """
+    Return the article's lowercased headline and description.
+    They are computed once and kept on the article, so later pipeline steps reuse them.
+    """
+    lowercased = article.get('_lowercased')
+    if lowercased is None:
+        lowercased = article['_lowercased'] = (
+            article.get('headline', '').lower(),
+            article.get('description', '').lower(),
+        )
+    return lowercased
+
+# Punctuation ignored when comparing headlines for exact duplicates
+HEADLINE_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
 def remove_duplicates(articles: List[Dict]) -> List[Dict]:
     """
     Remove duplicate articles based on headline similarity and content overlap.
@@ -152,39 +203,88 @@ def remove_duplicates(articles: List[Dict]) -> List[Dict]:
     seen_headlines = set()
     seen_urls = set()
     
+    # Word count of each kept headline, and the kept headlines each word appears in
+    unique_word_counts = []
+    word_index = {}
+    
     for article in articles:
-        headline = article.get('headline', '').lower().strip()
+        headline = lowercase_article_fields(article)[0].strip()
         url = article.get('url', '').strip()
         
-        # Skip if we've seen this exact headline or URL
-        if headline in seen_headlines or url in seen_urls:
+        # Skip if we've seen this headline (ignoring punctuation and spacing) or URL
+        signature = ' '.join(HEADLINE_PUNCTUATION_PATTERN.sub('', headline).split())
+        if signature in seen_headlines or url in seen_urls:
             continue
         
-        # Check for similar headlines (fuzzy matching)
-        is_duplicate = False
-        for existing_article in unique_articles:
-            existing_headline = existing_article.get('headline', '').lower().strip()
-            
-            # Calculate similarity
-            if headline and existing_headline:
-                # Simple similarity check (can be improved with more sophisticated algorithms)
-                words1 = set(headline.split())
-                words2 = set(existing_headline.split())
-                
-                # If more than 70% of words match, consider it a duplicate
-                if len(words1.intersection(words2)) / max(len(words1), len(words2)) > 0.7:
-                    is_duplicate = True
-                    break
+        # Check for similar headlines (fuzzy matching), on the same punctuation-free words.
+        # Only kept headlines sharing at least one word can overlap, so count shared words through the index.
+        words = set(signature.split())
+        shared_counts = {}
+        for word in words:
+            for position in word_index.get(word, ()):
+                shared_counts[position] = shared_counts.get(position, 0) + 1
+        
+        # If more than 70% of words match, consider it a duplicate
+        is_duplicate = any(
+            shared / max(len(words), unique_word_counts[position]) > 0.7
+            for position, shared in shared_counts.items()
+        )
         
         if not is_duplicate:
+            for word in words:
+                word_index.setdefault(word, []).append(len(unique_articles))
+            unique_word_counts.append(len(words))
             unique_articles.append(article)
-            seen_headlines.add(headline)
+            seen_headlines.add(signature)
             if url:
                 seen_urls.add(url)
     
     print(f"🔄 Removed {len(articles) - len(unique_articles)} duplicate articles")
     return unique_articles
 
+# --- AI CATEGORIZATION ---
+# Categories the AI may answer with, lowercased once for matching against its response
+AI_CATEGORIES = [
+    'Technology', 'Health', 'Government/Policy', 'Economy', 'Finance', 'World', 'Space'
+]
+AI_CATEGORY_NAMES = [(category, category.lower()) for category in AI_CATEGORIES]
+AI_CATEGORY_LOOKUP = {name: category for category, name in AI_CATEGORY_NAMES}
+
+# Hint words used to infer a category when the response names none of them, checked in order
+AI_CATEGORY_HINTS = [
+    ('Technology', ('tech', 'software')),
+    ('Health', ('health', 'medical')),
+    ('Government/Policy', ('government', 'policy', 'politics')),
+    ('Economy', ('economy', 'economic')),
+    ('Finance', ('finance', 'stock', 'market')),
+    ('World', ('world', 'international')),
+    ('Space', ('space', 'nasa')),
+]
+
+def parse_ai_category(response_text: str) -> Optional[str]:
+    """
+    Map one line of AI response text to a category.
+    Returns None if the text neither names a category nor contains a hint word.
+    """
+    text = response_text.lower()
+    
+    # Most responses are exactly a category name; no category name contains an earlier
+    # one, so this returns what the scan below would
+    if text in AI_CATEGORY_LOOKUP:
+        return AI_CATEGORY_LOOKUP[text]
+    
+    # Check if the response matches one of our categories
+    for category, name in AI_CATEGORY_NAMES:
+        if name in text:
+            return category
+    
+    # If no exact match, try to infer from the response
+    for category, hints in AI_CATEGORY_HINTS:
+        if any(hint in text for hint in hints):
+            return category
+    
+    return None
+
 def categorize_articles_batch(articles: List[Dict]) -> List[str]:
     """
     Categorize multiple articles in a single batch to reduce API calls.
@@ -192,13 +292,8 @@ def categorize_articles_batch(articles: List[Dict]) -> List[str]:
     if not articles:
         return []
     
-    # Define our categories for the AI
-    categories = [
-        'Technology', 'Health', 'Government/Policy', 'Economy', 'Finance', 'World', 'Space'
-    ]
-    
     # Prepare batch prompt
-    articles_text = ""
+    article_lines = []
     for i, article in enumerate(articles, 1):
         headline = article.get('headline', '')
         description = article.get('description', '')
@@ -206,7 +301,8 @@ def categorize_articles_batch(articles: List[Dict]) -> List[str]:
         full_text = f"{headline} {description} {content}".strip()
         
         if full_text:
-            articles_text += f"\n{i}. {full_text[:300]}\n"  # Limit each article to 300 chars
+            article_lines.append(f"\n{i}. {full_text[:300]}\n")  # Limit each article to 300 chars
+    articles_text = "".join(article_lines)
     
     # Create batch prompt for AI categorization
     prompt = f"""
@@ -227,19 +323,11 @@ def categorize_articles_batch(articles: List[Dict]) -> List[str]:
     
     try:
         # Use Gemini API for batch categorization
-        import requests
-        import os
-        from dotenv import load_dotenv
-        
-        load_dotenv()
-        GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-        GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1/models/gemini-1.5-flash:generateContent'
-        
         if not GEMINI_API_KEY:
             print("⚠️ GEMINI_API_KEY not found, using fallback categorization")
             return [categorize_article_fallback(article) for article in articles]
         
-        response = requests.post(
+        response = get_http_session().post(
             GEMINI_API_URL,
             headers={'Content-Type': 'application/json'},
             params={'key': GEMINI_API_KEY},
@@ -263,29 +351,8 @@ def categorize_articles_batch(articles: List[Dict]) -> List[str]:
                 for line in lines:
                     line = line.strip().replace('"', '').replace("'", "")
                     if line:
-                        # Check if the line contains a valid category
-                        for category in categories:
-                            if category.lower() in line.lower():
-                                categories_result.append(category)
-                                break
-                        else:
-                            # If no exact match, try to infer
-                            if 'tech' in line.lower() or 'software' in line.lower():
-                                categories_result.append('Technology')
-                            elif 'health' in line.lower() or 'medical' in line.lower():
-                                categories_result.append('Health')
-                            elif 'government' in line.lower() or 'policy' in line.lower() or 'politics' in line.lower():
-                                categories_result.append('Government/Policy')
-                            elif 'economy' in line.lower() or 'economic' in line.lower():
-                                categories_result.append('Economy')
-                            elif 'finance' in line.lower() or 'stock' in line.lower() or 'market' in line.lower():
-                                categories_result.append('Finance')
-                            elif 'world' in line.lower() or 'international' in line.lower():
-                                categories_result.append('World')
-                            elif 'space' in line.lower() or 'nasa' in line.lower():
-                                categories_result.append('Space')
-                            else:
-                                categories_result.append('Miscellaneous')
+                        # Use the category the line names or hints at
+                        categories_result.append(parse_ai_category(line) or 'Miscellaneous')
                 
                 # Ensure we have the right number of categories
                 while len(categories_result) < len(articles):
@@ -315,11 +382,6 @@ def categorize_article_with_ai(article: Dict) -> str:
     if not full_text:
         return 'Miscellaneous'
     
-    # Define our categories for the AI
-    categories = [
-        'Technology', 'Health', 'Government/Policy', 'Economy', 'Finance', 'World', 'Space'
-    ]
-    
     # Create prompt for AI categorization
     prompt = f"""
     Categorize this news article into exactly one of these categories:
@@ -338,19 +400,11 @@ def categorize_article_with_ai(article: Dict) -> str:
     
     try:
         # Use Gemini API for categorization
-        import requests
-        import os
-        from dotenv import load_dotenv
-        
-        load_dotenv()
-        GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-        GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1/models/gemini-1.5-flash:generateContent'
-        
         if not GEMINI_API_KEY:
             print("⚠️ GEMINI_API_KEY not found, using fallback categorization")
             return categorize_article_fallback(article)
         
-        response = requests.post(
+        response = get_http_session().post(
             GEMINI_API_URL,
             headers={'Content-Type': 'application/json'},
             params={'key': GEMINI_API_KEY},
@@ -370,26 +424,10 @@ def categorize_article_with_ai(article: Dict) -> str:
                 # Clean up the response and find the category
                 ai_response = ai_response.replace('"', '').replace("'", "").strip()
                 
-                # Check if the AI response matches one of our categories
-                for category in categories:
-                    if category.lower() in ai_response.lower():
-                        return category
-                
-                # If no exact match, try to infer from the response
-                if 'tech' in ai_response.lower() or 'software' in ai_response.lower():
-                    return 'Technology'
-                elif 'health' in ai_response.lower() or 'medical' in ai_response.lower():
-                    return 'Health'
-                elif 'government' in ai_response.lower() or 'policy' in ai_response.lower() or 'politics' in ai_response.lower():
-                    return 'Government/Policy'
-                elif 'economy' in ai_response.lower() or 'economic' in ai_response.lower():
-                    return 'Economy'
-                elif 'finance' in ai_response.lower() or 'stock' in ai_response.lower() or 'market' in ai_response.lower():
-                    return 'Finance'
-                elif 'world' in ai_response.lower() or 'international' in ai_response.lower():
-                    return 'World'
-                elif 'space' in ai_response.lower() or 'nasa' in ai_response.lower():
-                    return 'Space'
+                # Use the category the response names or hints at
+                category = parse_ai_category(ai_response)
+                if category:
+                    return category
         
         # Fallback to keyword-based categorization
         return categorize_article_fallback(article)
@@ -402,42 +440,18 @@ def categorize_article_fallback(article: Dict) -> str:
     """
     Fallback categorization using keyword matching when AI fails.
     """
-    text = (article.get('headline', '') + ' ' + article.get('description', '')).lower()
+    headline, description = lowercase_article_fields(article)
+    text = headline + ' ' + description
     
-    # Enhanced keyword-based categorization
-    for category, keywords in CATEGORIES.items():
-        for keyword in keywords:
-            if keyword.lower() in text:
-                return category
+    # Enhanced keyword-based categorization (first category in CATEGORIES order wins)
+    for category, pattern in CATEGORY_PATTERNS.items():
+        if pattern.search(text):
+            return category
     
     # Content analysis for specific patterns
-    # Government/Policy patterns
-    if any(pattern in text for pattern in ['white house', 'congress', 'senate', 'house of representatives', 'president', 'administration', 'federal government', 'executive order', 'supreme court']):
-        return 'Government/Policy'
-    
-    # Technology patterns
-    if any(pattern in text for pattern in ['microsoft', 'apple', 'google', 'amazon', 'tesla', 'nvidia', 'artificial intelligence', 'AI', 'software', 'tech company']):
-        return 'Technology'
-    
-    # World patterns (specific countries and international events)
-    if any(pattern in text for pattern in ['thailand', 'cambodia', 'iran', 'iranian', 'prince', 'defector', 'refugee', 'migration', 'border', 'diplomatic', 'foreign minister', 'embassy', 'ambassador']):
-        return 'World'
-    
-    # Space patterns
-    if any(pattern in text for pattern in ['nasa', 'spacex', 'astronaut', 'satellite', 'rocket', 'spacecraft', 'mars', 'moon', 'planet', 'galaxy', 'universe', 'orbit', 'launch', 'space station', 'iss']):
-        return 'Space'
-    
-    # Finance patterns (market-specific terms)
-    if any(pattern in text for pattern in ['stock market', 'earnings', 'trading', 'wall street', 'federal reserve', 'interest rate', 'dow jones', 'nasdaq', 's&p 500']):
-        return 'Finance'
-    
-    # Health patterns (medical terms)
-    if any(pattern in text for pattern in ['medical', 'hospital', 'doctor', 'patient', 'treatment', 'drug', 'pharmaceutical', 'fda', 'clinical trial', 'surgery', 'diagnosis', 'cancer', 'virus', 'infection', 'therapy', 'medication', 'cdc', 'who', 'genetics']):
-        return 'Health'
-    
-    # Economy patterns (economic indicators)
-    if any(pattern in text for pattern in ['gdp', 'inflation', 'jobs', 'employment', 'recession', 'economic growth', 'economic recovery', 'economic stimulus', 'consumer spending', 'retail sales', 'manufacturing']):
-        return 'Economy'
+    for category, pattern in FALLBACK_CONTENT_PATTERNS:
+        if pattern.search(text):
+            return category
     
     return 'Miscellaneous'
 
@@ -447,101 +461,86 @@ def categorize_article(article: Dict) -> str:
     """
     return categorize_article_with_ai(article)
 
-def calculate_article_priority(article: Dict) -> float:
-    """
-    Calculate priority score for an article based on multiple factors.
-    Higher score = higher priority.
-    """
-    score = 0.0
-    headline = article.get('headline', '').lower()
-    description = article.get('description', '').lower()
-    source = article.get('source', '').lower()
-    
-    # Source credibility (trusted sources get higher priority)
-    trusted_sources = [
-        'reuters', 'associated press', 'ap', 'bloomberg', 'bbc', 'wall street journal', 
-        'wsj', 'financial times', 'ft', 'the guardian', 'pbs newshour', 'politico',
-        'al jazeera', 'the hill', 'axios'
-    ]
-    
-    for trusted_source in trusted_sources:
-        if trusted_source in source:
-            score += 10.0
-            break
-    
-    # Breaking news indicators
-    breaking_keywords = [
-        'breaking', 'urgent', 'just in', 'developing', 'live', 'update', 'alert',
-        'crisis', 'emergency', 'deadline', 'deadline', 'immediate', 'critical'
-    ]
-    
-    for keyword in breaking_keywords:
-        if keyword in headline or keyword in description:
-            score += 8.0
-            break
-    
+# --- PRIORITY SCORING ---
+# Breaking news indicators
+BREAKING_KEYWORDS = [
+    'breaking', 'urgent', 'just in', 'developing', 'live', 'update', 'alert',
+    'crisis', 'emergency', 'deadline', 'immediate', 'critical'
+]
+
+# Topic tiers: (score added per matching keyword, keywords)
+PRIORITY_KEYWORD_TIERS = [
     # High-impact topics (politics, economy, major companies)
-    high_impact_keywords = [
+    (6.0, [
         'president', 'congress', 'senate', 'house', 'white house', 'administration',
         'federal reserve', 'fed', 'sec', 'fda', 'supreme court', 'election',
         'apple', 'microsoft', 'google', 'amazon', 'tesla', 'nvidia', 'meta',
         'jpmorgan', 'goldman sachs', 'bank of america', 'wells fargo',
         'pfizer', 'moderna', 'johnson & johnson', 'astrazeneca'
-    ]
-    
-    for keyword in high_impact_keywords:
-        if keyword in headline or keyword in description:
-            score += 6.0
-    
+    ]),
     # Market-moving events
-    market_keywords = [
+    (5.0, [
         'earnings', 'quarterly results', 'stock market', 'dow jones', 'nasdaq', 's&p',
         'merger', 'acquisition', 'ipo', 'bankruptcy', 'layoffs', 'hiring',
         'interest rate', 'inflation', 'gdp', 'jobs report', 'unemployment'
-    ]
-    
-    for keyword in market_keywords:
-        if keyword in headline or keyword in description:
-            score += 5.0
-    
+    ]),
     # Technology and innovation
-    tech_keywords = [
+    (4.0, [
         'artificial intelligence', 'ai', 'machine learning', 'blockchain', 'crypto',
         'cybersecurity', 'data breach', 'hack', 'software', 'startup', 'unicorn',
         'spacex', 'nasa', 'satellite', 'rocket', 'space exploration'
-    ]
-    
-    for keyword in tech_keywords:
-        if keyword in headline or keyword in description:
-            score += 4.0
-    
+    ]),
     # Health and safety
-    health_keywords = [
+    (4.0, [
         'covid', 'pandemic', 'vaccine', 'fda approval', 'clinical trial',
         'cancer', 'treatment', 'hospital', 'medical', 'healthcare', 'insurance',
         'genetics', 'medicine', 'cdc', 'who'
-    ]
-    
-    for keyword in health_keywords:
-        if keyword in headline or keyword in description:
-            score += 4.0
-    
+    ]),
     # International significance
-    world_keywords = [
+    (3.0, [
         'russia', 'ukraine', 'china', 'iran', 'north korea', 'israel', 'palestine',
         'nato', 'united nations', 'trade war', 'sanctions', 'embargo',
         'refugee', 'migration', 'border', 'diplomatic', 'embassy'
-    ]
+    ]),
+]
+
+# One alternation per list, so a text with no keyword from a tier is ruled out in one scan
+TRUSTED_SOURCE_PATTERN = compile_keyword_pattern(TRUSTED_KEYWORDS)
+BREAKING_KEYWORD_PATTERN = compile_keyword_pattern(BREAKING_KEYWORDS)
+PRIORITY_TIER_PATTERNS = [
+    (weight, keywords, compile_keyword_pattern(keywords))
+    for weight, keywords in PRIORITY_KEYWORD_TIERS
+]
+
+def calculate_article_priority(article: Dict) -> float:
+    """
+    Calculate priority score for an article based on multiple factors.
+    Higher score = higher priority.
+    """
+    score = 0.0
+    headline, description = lowercase_article_fields(article)
+    source = article.get('source', '').lower()
+    
+    # Source credibility (trusted sources get higher priority)
+    if TRUSTED_SOURCE_PATTERN.search(source):
+        score += 10.0
+    
+    # Breaking news indicators
+    if BREAKING_KEYWORD_PATTERN.search(headline) or BREAKING_KEYWORD_PATTERN.search(description):
+        score += 8.0
     
-    for keyword in world_keywords:
-        if keyword in headline or keyword in description:
-            score += 3.0
+    # Topic tiers add their weight once per keyword found. Most articles miss most
+    # tiers, so only tiers whose pattern hits count keywords one by one.
+    for weight, keywords, pattern in PRIORITY_TIER_PATTERNS:
+        if pattern.search(headline) or pattern.search(description):
+            for keyword in keywords:
+                if keyword in headline or keyword in description:
+                    score += weight
     
     # Recency bonus (newer articles get slight priority)
     published_at = article.get('published_at', '')
     if published_at:
         try:
-            from datetime import datetime, timezone
             pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
             now = datetime.now(timezone.utc)
             hours_old = (now - pub_date).total_seconds() / 3600
@@ -570,13 +569,10 @@ def select_high_priority_articles(articles: List[Dict], max_count: int = 20) ->
         return []
     
     # Calculate priority scores for all articles
-    scored_articles = []
-    for article in articles:
-        priority_score = calculate_article_priority(article)
-        scored_articles.append((article, priority_score))
+    scored_articles = [(article, calculate_article_priority(article)) for article in articles]
     
-    # Sort by priority score (highest first)
-    scored_articles.sort(key=lambda x: x[1], reverse=True)
+    # Keep only the highest scores (ties stay in input order), enough for the top 5 report too
+    scored_articles = heapq.nlargest(max(max_count, 5), scored_articles, key=itemgetter(1))
     
     # Select top articles
     selected_articles = [article for article, score in scored_articles[:max_count]]
@@ -596,6 +592,24 @@ def select_high_priority_articles(articles: List[Dict], max_count: int = 20) ->
     return selected_articles
 
 # --- PRIORITY SORTING ---
+# Category sort order (higher priority first); unknown categories sort with Miscellaneous
+CATEGORY_PRIORITY = {
+    'Finance': 1,      # High priority - market moving news
+    'Technology': 2,    # High priority - tech news
+    'Government/Policy': 3,  # High priority - policy impact
+    'Economy': 4,      # Medium priority
+    'Health': 5,       # Medium priority
+    'World': 6,        # Medium priority
+    'Space': 7,        # Medium priority
+    'Miscellaneous': 8  # Low priority - at bottom
+}
+
+def category_sort_key(column: pd.Series) -> pd.Series:
+    """Sort key that ranks the category column by CATEGORY_PRIORITY and leaves other columns as-is."""
+    if column.name == 'category':
+        return column.map(CATEGORY_PRIORITY).fillna(CATEGORY_PRIORITY['Miscellaneous'])
+    return column
+
 def sort_articles_by_priority(df: pd.DataFrame) -> pd.DataFrame:
     """
     Sort articles by priority: categorized articles first, miscellaneous at bottom.
@@ -604,30 +618,13 @@ def sort_articles_by_priority(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     
-    # Define priority order (higher priority first)
-    priority_order = {
-        'Finance': 1,      # High priority - market moving news
-        'Technology': 2,    # High priority - tech news
-        'Government/Policy': 3,  # High priority - policy impact
-        'Economy': 4,      # Medium priority
-        'Health': 5,       # Medium priority
-        'World': 6,        # Medium priority
-        'Miscellaneous': 7  # Low priority - at bottom
-    }
-    
-    # Add priority column
-    df = df.copy()
-    df['priority'] = df['category'].map(priority_order).fillna(7)
-    
-    # Sort by priority, then by published date (newest first)
-    df_sorted = df.sort_values(['priority', 'published_at'], ascending=[True, False])
-    
-    # Remove priority column (keep it clean)
-    df_sorted = df_sorted.drop('priority', axis=1)
-    
-    return df_sorted
+    # Sort by category priority, then by published date (newest first)
+    return df.sort_values(['category', 'published_at'], ascending=[True, False], key=category_sort_key)
 
 # --- MAIN ORCHESTRATOR ---
+# Columns of the collected articles DataFrame (category is added after categorization)
+ARTICLE_COLUMNS = ['headline', 'content', 'url', 'source', 'published_at']
+
 def collect_all_news() -> pd.DataFrame:
     """
     Fetch news from all sources, prioritize, categorize, and return as a DataFrame.
@@ -665,15 +662,16 @@ def collect_all_news() -> pd.DataFrame:
         print(f"⚠️ AI categorization failed: {e}, using fallback")
         categories = [categorize_article_fallback(article) for article in high_priority_articles]
     
-    # Add categories to high-priority articles
-    for i, article in enumerate(high_priority_articles):
-        if i < len(categories):
-            article['category'] = categories[i]
-        else:
-            article['category'] = 'Miscellaneous'
+    # Pad with Miscellaneous for any article the categorizer returned no category for
+    categories = list(categories[:len(high_priority_articles)])
+    categories += ['Miscellaneous'] * (len(high_priority_articles) - len(categories))
     
-    # Convert to DataFrame and sort by priority
-    df = pd.DataFrame(high_priority_articles)
+    # Build the DataFrame column by column and sort by priority
+    df = pd.DataFrame({
+        column: [article.get(column) for article in high_priority_articles]
+        for column in ARTICLE_COLUMNS
+    })
+    df['category'] = categories
     df = sort_articles_by_priority(df)
     return df
 
@@ -1,8 +1,14 @@
+import hashlib
 import os
-import requests
+import re
+import sqlite3
+import threading
+import time
 import pandas as pd
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Tuple
 from dotenv import load_dotenv
+from http_session import get_http_session
 
 load_dotenv()
 
@@ -10,6 +16,16 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1/models/gemini-1.5-flash:generateContent'
 
+# Concurrent Gemini requests when summarizing articles one by one
+INDIVIDUAL_SUMMARY_WORKERS = 5
+# Most articles summarized one by one after a failed batch, which is usually rate limited
+INDIVIDUAL_FALLBACK_LIMIT = 10
+
+# Batch prompts are split into packs of at most this many article characters (~15k tokens),
+# so a large day does not overflow the context window and lose the tail summaries
+BATCH_PROMPT_MAX_CHARS = 60000
+BATCH_SUMMARY_WORKERS = 4
+
 # --- PROMPT TEMPLATE ---
 SUMMARY_PROMPT = (
     "Summarize each of the following news articles in 2–3 sentences. "
@@ -18,6 +34,74 @@ SUMMARY_PROMPT = (
     "Articles:\n{text}"
 )
 
+# Numbering at the start of a batch response line ("1. " or "1) "), followed by the summary
+NUMBERED_LINE_PATTERN = re.compile(r'\d+[.)]\s+(.*)')
+
+# --- SUMMARY CACHE ---
+# Summaries are stored by a hash of the article's headline and content, so articles that
+# reappear in later runs (NewsAPI returns a two-day window) are not sent to Gemini again.
+# The batch and individual paths share the key, so either can reuse the other's summaries.
+# The file sits next to this module unless SUMMARY_CACHE_FILE points elsewhere.
+SUMMARY_CACHE_FILE = os.getenv('SUMMARY_CACHE_FILE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'summary_cache.sqlite'
+)
+# Entries older than this are dropped when the cache is opened, which also bounds its size
+SUMMARY_CACHE_MAX_AGE_DAYS = 7
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache() -> sqlite3.Connection:
+    """Return the summary cache connection, creating the database and dropping expired entries on first use."""
+    global _summary_cache
+    
+    if _summary_cache is None:
+        cache = sqlite3.connect(SUMMARY_CACHE_FILE, check_same_thread=False)
+        cache.execute(
+            'CREATE TABLE IF NOT EXISTS article_summaries '
+            '(cache_key TEXT PRIMARY KEY, summary TEXT, created_at REAL)'
+        )
+        cache.execute(
+            'DELETE FROM article_summaries WHERE created_at < ?',
+            (time.time() - SUMMARY_CACHE_MAX_AGE_DAYS * 86400,)
+        )
+        cache.commit()
+        _summary_cache = cache
+    return _summary_cache
+
+def summary_cache_key(headline: str, content: str) -> str:
+    """
+    Hash an article's headline and content into a summary cache key.
+    The model and prompt are part of the key, so changing either starts a fresh cache.
+    """
+    article = f"{headline}\n{content}".strip()
+    text = '\n'.join((GEMINI_API_URL, SUMMARY_PROMPT, article))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def get_cached_summary(key: str) -> Optional[str]:
+    """Return the cached summary for this cache key, or None if there is none."""
+    try:
+        with _summary_cache_lock:
+            row = get_summary_cache().execute(
+                'SELECT summary FROM article_summaries WHERE cache_key = ?', (key,)
+            ).fetchone()
+        return row[0] if row else None
+    except sqlite3.Error as e:
+        print(f"⚠️ Summary cache read failed: {e}")
+        return None
+
+def cache_summary(key: str, summary: str) -> None:
+    """Store a summary under this cache key."""
+    try:
+        with _summary_cache_lock:
+            cache = get_summary_cache()
+            cache.execute(
+                'INSERT OR REPLACE INTO article_summaries (cache_key, summary, created_at) VALUES (?, ?, ?)',
+                (key, summary, time.time())
+            )
+            cache.commit()
+    except sqlite3.Error as e:
+        print(f"⚠️ Summary cache write failed: {e}")
+
 # --- SUMMARIZATION FUNCTION ---
 def summarize_and_neutralize(text: str) -> Optional[str]:
     """
@@ -36,7 +120,7 @@ def summarize_and_neutralize(text: str) -> Optional[str]:
         "contents": [{"parts": [{"text": prompt}]}]
     }
     try:
-        response = requests.post(GEMINI_API_URL, headers=headers, params=params, json=data, timeout=30)
+        response = get_http_session().post(GEMINI_API_URL, headers=headers, params=params, json=data, timeout=30)
         response.raise_for_status()
         result = response.json()
         # Gemini returns summary in a nested structure
@@ -52,74 +136,131 @@ def summarize_articles_batch(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     
-    # Prepare batch prompt
-    articles_text = ""
-    for i, (_, article) in enumerate(df.iterrows(), 1):
-        headline = article.get('headline', '')
-        content = article.get('content', '')
+    # Combine headline and content, reusing summaries from earlier runs where possible
+    headlines = df['headline'].fillna('')
+    contents = df['content'].fillna('')
+    full_texts = [f"{headline}\n{content}".strip() for headline, content in zip(headlines, contents)]
+    cache_keys = [summary_cache_key(headline, content) for headline, content in zip(headlines, contents)]
+    summaries = [get_cached_summary(key) for key in cache_keys]
+    pending = [i for i, summary in enumerate(summaries) if summary is None]
+    if len(pending) < len(df):
+        print(f"💾 Reusing {len(df) - len(pending)} cached summaries")
+    
+    if pending:
+        # Split the uncached articles into packs that fit one prompt and send them concurrently
+        packs = list(pack_batch_texts([full_texts[i] for i in pending]))
+        if len(packs) > 1:
+            print(f"📦 Splitting {len(pending)} articles into {len(packs)} batch requests")
+        failed = []
+        with ThreadPoolExecutor(max_workers=BATCH_SUMMARY_WORKERS) as executor:
+            futures = [executor.submit(summarize_pack, [full_texts[pending[p]] for p in pack]) for pack in packs]
+            for pack, future in zip(packs, futures):
+                # A failed pack only loses its own articles; the others keep their summaries
+                try:
+                    pack_summaries, cacheable = future.result()
+                except Exception as e:
+                    print(f"❌ Batch request for {len(pack)} articles failed: {e}")
+                    failed.extend(pending[p] for p in pack)
+                    error = e
+                    continue
+                for p, summary in zip(pack, pack_summaries):
+                    if summary:
+                        i = pending[p]
+                        summaries[i] = summary
+                        if cacheable:
+                            cache_summary(cache_keys[i], summary)
         
-        # Combine headline and content
-        full_text = f"{headline}\n{content}".strip()
-        articles_text += f"\n{i}. {full_text}\n"
+        # With no batch request through, let summarize_articles fall back as before
+        if len(failed) == len(pending):
+            print(f"❌ Batch summarization failed: {error}")
+            raise error
+        if failed:
+            # Same cap as the full fallback; articles past it keep no summary
+            retried = failed[:INDIVIDUAL_FALLBACK_LIMIT]
+            print(f"🔄 Summarizing {len(retried)} articles from failed batch requests individually...")
+            fallback = summarize_articles_individual(df.iloc[retried])
+            for i, summary in zip(retried, fallback['summary']):
+                summaries[i] = summary
     
-    batch_prompt = SUMMARY_PROMPT.format(text=articles_text)
+    # Add summaries to DataFrame in one column assignment (object dtype keeps missing ones as None)
+    df_with_summaries = df.assign(summary=pd.Series(
+        [summary or None for summary in summaries], index=df.index, dtype=object
+    ))
     
-    try:
-        print(f"🤖 Sending batch request for {len(df)} articles...")
-        response = requests.post(
-            GEMINI_API_URL,
-            headers={'Content-Type': 'application/json'},
-            params={'key': GEMINI_API_KEY},
-            json={
-                'contents': [{
-                    'parts': [{'text': batch_prompt}]
-                }]
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if 'candidates' in data and data['candidates']:
-                batch_summary = data['candidates'][0]['content']['parts'][0]['text']
-                summaries = parse_batch_summaries(batch_summary, len(df))
-                
-                # Add summaries to DataFrame
-                df_with_summaries = df.copy()
-                df_with_summaries['summary'] = None  # Initialize summary column
-                for i, summary in enumerate(summaries):
-                    if i < len(df_with_summaries) and summary:
-                        df_with_summaries.iloc[i, df_with_summaries.columns.get_loc('summary')] = summary
-                
-                print(f"✅ Successfully summarized {len(df)} articles in one batch!")
-                return df_with_summaries
-            else:
-                raise Exception("No response content from Gemini API")
-        else:
-            print(f"❌ Gemini API request failed with status {response.status_code}")
-            if response.status_code == 429:
-                print("⏰ Rate limit exceeded - falling back to individual summarization")
-            elif response.status_code == 400:
-                print("🔧 Bad request - check prompt format")
-            raise Exception(f"Gemini API error: {response.status_code}")
-            
-    except Exception as e:
-        print(f"❌ Batch summarization failed: {e}")
-        raise
+    summarized = df_with_summaries['summary'].notna().sum()
+    print(f"✅ Successfully summarized {summarized} of {len(df)} articles in batch!")
+    return df_with_summaries
 
-def parse_batch_summaries(batch_response: str, expected_count: int) -> List[str]:
+def pack_batch_texts(texts: List[str], max_chars: int = BATCH_PROMPT_MAX_CHARS):
+    """Yield lists of positions into texts, each pack totalling at most max_chars (one text per pack at minimum)."""
+    pack = []
+    size = 0
+    for position, text in enumerate(texts):
+        if pack and size + len(text) > max_chars:
+            yield pack
+            pack = []
+            size = 0
+        pack.append(position)
+        size += len(text)
+    if pack:
+        yield pack
+
+def summarize_pack(texts: List[str]) -> Tuple[List[Optional[str]], bool]:
     """
-    Parse the batch response from Gemini into individual summaries.
+    Summarize one pack of article texts with a single Gemini request.
+    Returns the summaries and whether the response numbered exactly one summary per text,
+    the only case where each summary is known to belong to its article and is safe to cache.
     """
+    # Prepare batch prompt
+    article_lines = [f"\n{n}. {text}\n" for n, text in enumerate(texts, 1)]
+    articles_text = "".join(article_lines)
+    
+    batch_prompt = SUMMARY_PROMPT.format(text=articles_text)
+    
+    print(f"🤖 Sending batch request for {len(texts)} articles...")
+    response = get_http_session().post(
+        GEMINI_API_URL,
+        headers={'Content-Type': 'application/json'},
+        params={'key': GEMINI_API_KEY},
+        json={
+            'contents': [{
+                'parts': [{'text': batch_prompt}]
+            }]
+        },
+        timeout=60
+    )
+    
+    if response.status_code == 200:
+        data = response.json()
+        if 'candidates' in data and data['candidates']:
+            batch_summary = data['candidates'][0]['content']['parts'][0]['text']
+            numbered = parse_numbered_summaries(batch_summary)
+            if len(numbered) == len(texts):
+                return numbered, True
+            # Padded or possibly shifted summaries are used for this digest only
+            return parse_batch_summaries(batch_summary, len(texts)), False
+        raise Exception("No response content from Gemini API")
+    
+    print(f"❌ Gemini API request failed with status {response.status_code}")
+    if response.status_code == 429:
+        print("⏰ Rate limit exceeded - falling back to individual summarization")
+    elif response.status_code == 400:
+        print("🔧 Bad request - check prompt format")
+    raise Exception(f"Gemini API error: {response.status_code}")
+
+def parse_numbered_summaries(batch_response: str) -> List[str]:
+    """Return the summaries on the numbered lines of a batch response, in order."""
     summaries = []
-    lines = batch_response.split('\n')
     
-    for line in lines:
+    for line in batch_response.split('\n'):
         line = line.strip()
         # Look for numbered summaries (1., 2., 3., etc.)
-        if line and (line[0].isdigit() or line.startswith('1.') or line.startswith('2.') or line.startswith('3.') or line.startswith('4.') or line.startswith('5.')):
+        if line and line[0].isdigit():
             # Extract summary text (remove numbering)
-            if '. ' in line:
+            numbered = NUMBERED_LINE_PATTERN.match(line)
+            if numbered:
+                summary = numbered.group(1).strip()
+            elif '. ' in line:
                 summary = line.split('. ', 1)[-1].strip()
             elif line[0].isdigit() and len(line) > 2:
                 summary = line[2:].strip()
@@ -128,6 +269,15 @@ def parse_batch_summaries(batch_response: str, expected_count: int) -> List[str]
             if summary and summary != 'None':
                 summaries.append(summary)
     
+    return summaries
+
+def parse_batch_summaries(batch_response: str, expected_count: int) -> List[str]:
+    """
+    Parse the batch response from Gemini into individual summaries.
+    """
+    summaries = parse_numbered_summaries(batch_response)
+    lines = batch_response.split('\n')
+    
     # If we didn't find enough summaries, try a different approach
     if len(summaries) < expected_count:
         # Look for any text that might be a summary
@@ -146,11 +296,22 @@ def summarize_articles_individual(df: pd.DataFrame) -> pd.DataFrame:
     """
     Fallback method: summarize articles individually (original method).
     """
-    summaries = []
-    for idx, row in df.iterrows():
-        text = row.get('content') or row.get('headline', '')
-        summary = summarize_and_neutralize(text)
-        summaries.append(summary)
+    # Summarize the content, or the headline when an article has no content
+    headlines = df['headline'].fillna('')
+    contents = df['content'].fillna('')
+    texts = [content or headline for headline, content in zip(headlines, contents)]
+    
+    # Reuse summaries cached by either path, keyed by the same headline and content
+    cache_keys = [summary_cache_key(headline, content) for headline, content in zip(headlines, contents)]
+    summaries = [get_cached_summary(key) for key in cache_keys]
+    pending = [i for i, summary in enumerate(summaries) if summary is None]
+    
+    # Requests are network-bound, so send a few at a time (results keep article order)
+    with ThreadPoolExecutor(max_workers=INDIVIDUAL_SUMMARY_WORKERS) as executor:
+        for i, summary in zip(pending, executor.map(summarize_and_neutralize, [texts[i] for i in pending])):
+            summaries[i] = summary
+            if summary:
+                cache_summary(cache_keys[i], summary)
     df = df.copy()
     df['summary'] = summaries
     return df
@@ -170,7 +331,7 @@ def summarize_articles(df: pd.DataFrame) -> pd.DataFrame:
     except Exception as e:
         print(f"⚠️  Batch summarization failed: {e}")
         print("🔄 Falling back to individual summarization...")
-        return summarize_articles_individual(df.head(10))  # Limit to 10 for rate limits
+        return summarize_articles_individual(df.head(INDIVIDUAL_FALLBACK_LIMIT))  # Limit for rate limits
 
 if __name__ == "__main__":
     # Example usage: load articles and summarize